@@ -3,6 +3,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import warnings
+import os
+import re
+import tempfile
 import numpy as np
 import streamlit as st
 
@@ -16,67 +19,114 @@ BRAND_COLOR = '#FFBF00' # Gold
 POSITIVE_COLOR = '#059669' # Green
 NEGATIVE_COLOR = '#E11D48' # Red
 FONT_FAMILY = "Arial"
+MONTH_ORDER = ['May', 'June', 'July', 'August', 'September', 'October']
 
 # --- 1. Load, Clean, and FEATURE ENGINEER ---
 
-@st.cache_data # Cache the data loading
-def categorize_item(item_name):
-    """
-    Applies business logic to categorize items.
-    *** UPDATED LOGIC TO FIX CLASSIFICATION ***
-    """
-    item_name_low = item_name.lower()
-    
+# Category keywords, built once at import rather than on every call
+_APP_KW = ('dumpling', 'wings', 'tenders', 'roll', 'crab', 'rangoon', 'bun', 'steam')
+_NOODLE_KW = ('ramen', 'noodle')
+_RICE_KW = ('rice',)
+_COMBO_KW = ('combo', 'special')
+_DRINK_KW = ('tea', 'lemonade', 'soda', 'coke', 'pepsi', 'starry', 'crush')
+
+# Rules in priority order: earlier categories win when several keywords match
+_CATEGORY_RULES = (
     # 1. Appetizers (Check first to catch 'steam' before 'tea')
-    if any(app in item_name_low for app in [
-        'dumpling', 'wings', 'tenders', 'roll', 'crab', 'rangoon', 'bun', 'steam'
-    ]):
-        return 'Appetizers'
-        
+    ('Appetizers', _APP_KW),
     # 2. Noodles
-    if 'ramen' in item_name_low or 'noodle' in item_name_low:
-        return 'Noodle Dishes'
-        
+    ('Noodle Dishes', _NOODLE_KW),
     # 3. Rice
-    if 'rice' in item_name_low:
-        return 'Rice Dishes'
-        
+    ('Rice Dishes', _RICE_KW),
     # 4. Combos
-    if 'combo' in item_name_low or 'special' in item_name_low:
-        return 'Combos/Specials'
-        
+    ('Combos/Specials', _COMBO_KW),
     # 5. Drinks (Check last, now that 'steam' is handled)
-    if any(drink in item_name_low for drink in ['tea', 'lemonade', 'soda', 'coke', 'pepsi', 'starry', 'crush']):
-        return 'Drinks'
-    
+    ('Drinks', _DRINK_KW),
+)
+# One alternation regex per category
+_CATEGORY_PATTERNS = tuple(
+    (category, '|'.join(map(re.escape, keywords))) for category, keywords in _CATEGORY_RULES
+)
+
+def categorize_items(item_names):
+    """
+    Applies business logic to categorize items.
+    *** VECTORIZED: each unique name is categorized once, then mapped back ***
+    """
+    uniq = item_names.drop_duplicates()
+    low = uniq.str.lower()
+
     # Default category
-    return 'Other Entrees'
+    cats = np.full(len(uniq), 'Other Entrees', dtype=object)
+
+    # Apply masks in reverse priority so earlier categories overwrite later ones
+    for category, pat in reversed(_CATEGORY_PATTERNS):
+        mask = low.str.contains(pat, regex=True, na=False).to_numpy()
+        cats[mask] = category
+
+    return item_names.map(dict(zip(uniq, cats)))
 
 @st.cache_data # Cache the data loading
 def load_and_clean_data(filepath="Final_Data.csv"):
     """
     Loads, cleans, and enriches the data with a new 'Category' column.
     This is the only usable file.
+    The cleaned frame is cached next to the CSV as Parquet and reused while
+    it is at least as new as both the CSV and this script (whose cleaning
+    logic and dtypes it captures), so cold starts skip the CSV reparse.
     """
+    parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+    if (os.path.exists(filepath) and os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= max(os.path.getmtime(filepath), os.path.getmtime(__file__))):
+        try:
+            df = pd.read_parquet(parquet_path)
+            print(f"Data loaded from cache {parquet_path}.")
+            return df
+        except Exception as e:
+            # A corrupt or unreadable cache must never keep the app down
+            print(f"Could not read Parquet cache {parquet_path}, reparsing the CSV: {e}")
+
     try:
-        df = pd.read_csv(filepath)
+        # thousands=',' turns "2,122"-style counts into numbers at parse time
+        df = pd.read_csv(filepath, thousands=',')
     except FileNotFoundError:
         st.error(f"Error: {filepath} not found. Please make sure Final_Data.csv is in the same folder.")
         return None
 
-    # Clean Amount
-    df['Amount'] = df['Amount'].replace({r'\$': '', ',': ''}, regex=True).astype(float)
-    # Clean Count
-    df['Count'] = pd.to_numeric(df['Count'].replace({',': ''}, regex=True), errors='coerce').fillna(0).astype(int)
+    # Dollar amounts fit float32 and counts fit int32: half the bytes per groupby
+    # Clean Amount (plain string ops, no regex engine: "$6,921.26" -> 6921.26)
+    df['Amount'] = df['Amount'].astype(str).str.replace(',', '', regex=False).str.removeprefix('$').astype(np.float32)
+    # Clean Count (already numeric unless some cell is malformed)
+    df['Count'] = pd.to_numeric(df['Count'], errors='coerce').fillna(0).astype(np.int32)
     
-    # Define month order
-    month_order = ['May', 'June', 'July', 'August', 'September', 'October']
-    df['Month'] = pd.Categorical(df['Month'], categories=month_order, ordered=True)
+    # Apply month order
+    df['Month'] = pd.Categorical(df['Month'], categories=MONTH_ORDER, ordered=True)
     
     # *** NEW FEATURE ENGINEERING ***
-    df['Category'] = df['Item Name'].apply(categorize_item)
+    df['Category'] = categorize_items(df['Item Name'])
+
+    # Categorical dtypes so every groupby reuses the factorized codes
+    df['Item Name'] = df['Item Name'].astype('category')
+    df['Category'] = df['Category'].astype('category')
     
     print("Data loaded, cleaned, and categorized successfully.")
+
+    # Categorical dtypes round-trip through the Parquet metadata.
+    # Write to a temp file and rename it into place, so an interrupted write
+    # never leaves a truncated cache behind.
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(parquet_path)),
+            prefix=os.path.basename(parquet_path) + '.', suffix='.tmp'
+        )
+        os.close(fd)
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, parquet_path)
+    except Exception as e:
+        print(f"Could not write Parquet cache {parquet_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
     return df
 
 @st.cache_data
@@ -84,59 +134,118 @@ def get_item_summary(df):
     """
     Helper function to get the base summary data for what-if analysis.
     """
-    item_summary = df.groupby('Item Name').agg(
+    item_summary = df.groupby('Item Name', observed=True).agg(
         Total_Amount=('Amount', 'sum'),
         Total_Count=('Count', 'sum')
     ).reset_index()
+    item_summary['Item Name'] = item_summary['Item Name'].astype(str)
     
     # Add a small epsilon to avoid division by zero if count is 0
     item_summary['Avg_Price'] = (item_summary['Total_Amount'] / (item_summary['Total_Count'] + 1e-6)).fillna(0)
     return item_summary
 
+@st.cache_data
+def get_item_arrays(df):
+    """
+    Helper function to get the item summary as plain NumPy arrays for the what-if path,
+    plus a map from each item name to its position in those arrays.
+    """
+    s = get_item_summary(df)
+    return (
+        # Fixed-width unicode, not object dtype: Streamlit hashes ndarrays by their
+        # bytes, and object arrays would hash their (per-unpickle) pointers instead
+        s['Item Name'].to_numpy(dtype=str),
+        s['Total_Count'].to_numpy(np.int64),
+        s['Total_Amount'].to_numpy(np.float32),
+        s['Avg_Price'].to_numpy(np.float32),
+        {name: i for i, name in enumerate(s['Item Name'])}
+    )
+
+@st.cache_data
+def get_item_month_pivot(df):
+    """
+    Helper function to get the (Item Name x Month) revenue pivot.
+    One pass over the raw rows that every per-item / per-month plot derives from.
+    Months in which an item had no rows stay NaN (sums skip them), so trend
+    lines don't show invented $0 points. Every month is kept as a column, even
+    one with no rows at all, so the month axis stays complete.
+    """
+    pivot = df.pivot_table(
+        index='Item Name', columns='Month', values='Amount',
+        aggfunc='sum', observed=True
+    )
+    return pivot.reindex(columns=pd.CategoricalIndex(
+        MONTH_ORDER, categories=MONTH_ORDER, ordered=True, name='Month'
+    ))
+
+def top_n_positions(values, n):
+    """
+    Helper function to get the positions of the n largest values, largest first.
+    Partitions in O(U) and only sorts the n winners, unlike a full sort.
+    Ties resolve lowest position first, matching nlargest(keep='first').
+    """
+    if len(values) > n:
+        # The n-th largest value; ties on it are filled in lowest position first
+        kth = np.partition(values, -n)[-n]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[:n - len(above)]
+        idx = np.sort(np.concatenate([above, ties]))
+    else:
+        idx = np.arange(len(values))
+    return idx[np.argsort(-values[idx], kind='stable')]
+
 # --- 2. Generate Visualizations (Polished Plots) ---
+# Plots that are pure functions of the (cached) data are cached as figures with
+# @st.cache_resource, so reruns reuse them instead of rebuilding. Callers must not
+# mutate the returned figures. The interactive plots stay uncached.
+
+# Shared layout, built once instead of re-allocating the nested dicts per plot.
+# The template is left out: merging a Layout's template object blends it into the
+# figure's default template, whereas the template name replaces it outright.
+_BASE_LAYOUT = go.Layout(
+    title_x=0.5, # Center the title
+    font=dict(family=FONT_FAMILY, color='white'),
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1
+    )
+)
 
 def apply_global_styles(fig, title):
     """
     Applies our consistent "beautify" styles to every plot.
     """
-    fig.update_layout(
-        title_text=title,
-        title_x=0.5, # Center the title
-        template=DASHBOARD_TEMPLATE,
-        font=dict(family=FONT_FAMILY, color='white'),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+    fig.update_layout(_BASE_LAYOUT, template=DASHBOARD_TEMPLATE, title_text=title)
     return fig
 
-def make_plot1_sales_per_month(df):
+@st.cache_resource
+def make_plot1_sales_per_month(pivot):
     """ PLOT 1: Total Sales per Month (Bar Chart) """
-    sales_per_month = df.groupby('Month')['Amount'].sum().reset_index()
+    sales_per_month = pivot.sum(axis=0).reset_index(name='Amount')
     
-    fig = px.bar(
-        sales_per_month, x='Month', y='Amount',
-        labels={'Amount': 'Total Sales ($)'}, text_auto='.2s'
-    )
-    fig.update_traces(marker_color=BRAND_COLOR, textposition='outside')
+    fig = go.Figure(go.Bar(
+        x=sales_per_month['Month'], y=sales_per_month['Amount'],
+        marker_color=BRAND_COLOR, texttemplate='%{y:.2s}', textposition='outside',
+        hovertemplate='Month=%{x}<br>Total Sales ($)=%{y}<extra></extra>'
+    ))
     fig = apply_global_styles(fig, 'Total Revenue Trend (Proxy for Monthly Usage)')
     fig.update_layout(yaxis_title='Total Revenue ($)', xaxis_title='Month')
     return fig
 
-def make_plot2_top_10_items(df):
+@st.cache_resource
+def make_plot2_top_10_items(pivot):
     """ PLOT 2: Top 10 Revenue-Generating Items (Bar Chart) """
-    top_10_items = df.groupby('Item Name')['Amount'].sum().nlargest(10).reset_index()
+    item_sum = pivot.sum(axis=1)
+    top_10_items = item_sum.iloc[top_n_positions(item_sum.to_numpy(), 10)].reset_index(name='Amount')
 
-    fig = px.bar(
-        top_10_items, x='Item Name', y='Amount',
-        labels={'Amount': 'Total Revenue ($)', 'Item Name': 'Menu Item'},
-        text_auto='.2s'
-    )
-    fig.update_traces(marker_color=BRAND_COLOR)
+    fig = go.Figure(go.Bar(
+        x=top_10_items['Item Name'], y=top_10_items['Amount'],
+        marker_color=BRAND_COLOR, texttemplate='%{y:.2s}',
+        hovertemplate='Menu Item=%{x}<br>Total Revenue ($)=%{y}<extra></extra>'
+    ))
     fig = apply_global_styles(fig, 'Top 10 Revenue-Driving Items (Core Inventory)')
     fig.update_layout(
         xaxis={'categoryorder':'total descending'}, 
@@ -144,47 +253,36 @@ def make_plot2_top_10_items(df):
     )
     return fig, top_10_items
 
-def make_plot3_what_if_quadrant(item_summary_df, item_to_change, count_change_pct, price_change_pct):
-    """ 
-    PLOT 3: *** "WHAT-IF" VERSION ***
-    This function takes the what-if inputs and returns the modified plot.
+@st.cache_resource(max_entries=32)
+def _quadrant_base(names, counts, amounts, prices, item_to_change):
     """
-    
-    df_what_if = item_summary_df.copy()
-    
-    try:
-        item_row = df_what_if[df_what_if['Item Name'] == item_to_change].iloc[0]
-    except IndexError:
-        st.error(f"Could not find item '{item_to_change}' to model.")
-        return go.Figure()
+    Static layer of PLOT 3: every item except the one being modeled, plus the
+    quadrant lines and labels. None of it depends on the what-if sliders, so it
+    is built once per selected item and reused on every slider move.
+    """
+    # Filter every column with a single precomputed mask
+    other_mask = names != item_to_change
 
-    # Apply "what-if" logic
-    new_count = item_row['Total_Count'] * (1 + count_change_pct / 100)
-    new_price = item_row['Avg_Price'] * (1 + price_change_pct / 100)
-    new_amount = new_count * new_price
-    
-    df_what_if.loc[df_what_if['Item Name'] == item_to_change, 'Total_Count'] = new_count
-    df_what_if.loc[df_what_if['Item Name'] == item_to_change, 'Total_Amount'] = new_amount
-    df_what_if.loc[df_what_if['Item Name'] == item_to_change, 'Avg_Price'] = new_price
-    
-    median_amount = df_what_if['Total_Amount'].median()
-    median_count = df_what_if['Total_Count'].median()
+    median_amount = np.median(amounts)
+    median_count = np.median(counts)
+    max_amount = amounts.max()
+    max_count = counts.max()
 
     fig = go.Figure()
     
     # Add all other items
-    fig.add_trace(go.Scatter(
-        x=df_what_if[df_what_if['Item Name'] != item_to_change]['Total_Count'], 
-        y=df_what_if[df_what_if['Item Name'] != item_to_change]['Total_Amount'],
+    fig.add_trace(go.Scattergl(
+        x=counts[other_mask], 
+        y=amounts[other_mask],
         mode='markers',
         name='Other Items',
         marker=dict(
-            size=df_what_if['Total_Amount'] / 2000, sizemin=4, sizemode='diameter',
-            color=df_what_if['Avg_Price'], colorscale='Viridis',
+            size=amounts[other_mask] / 2000, sizemin=4, sizemode='diameter',
+            color=prices[other_mask], colorscale='Viridis',
             showscale=True, colorbar=dict(title='Avg. Price ($)'),
             opacity=0.5 
         ),
-        text=df_what_if['Item Name'],
+        text=names[other_mask],
         hovertemplate=(
             "<b>%{text}</b><br>" +
             "Total Sold: %{x:,.0f}<br>" +
@@ -193,21 +291,62 @@ def make_plot3_what_if_quadrant(item_summary_df, item_to_change, count_change_pc
             "<extra></extra>"
         )
     ))
+
+    # Add quadrant lines
+    fig.add_shape(type="line", x0=median_count, y0=0, x1=median_count, y1=max_amount, line=dict(color="Gray", width=2, dash="dash"))
+    fig.add_shape(type="line", x0=0, y0=median_amount, x1=max_count, y1=median_amount, line=dict(color="Gray", width=2, dash="dash"))
+    
+    # Add quadrant labels
+    fig.add_annotation(x=max_count, y=max_amount, text="<b>STARS</b><br>(High Sales, High Profit)", showarrow=False, xanchor='right', yanchor='top', font=dict(color='white', size=14))
+    fig.add_annotation(x=0, y=max_amount, text="<b>NICHE/PREMIUM</b><br>(Low Sales, High Profit)", showarrow=False, xanchor='left', yanchor='top', font=dict(color='white', size=14))
+    fig.add_annotation(x=max_count, y=0, text="<b>WORKHORSES</b><br>(High Sales, Low Profit)", showarrow=False, xanchor='right', yanchor='bottom', font=dict(color='white', size=14))
+    fig.add_annotation(x=0, y=0, text="<b>DOGS</b><br>(Low Sales, Low Profit)", showarrow=False, xanchor='left', yanchor='bottom', font=dict(color='white', size=14))
+
+    fig = apply_global_styles(fig, 'Item Analysis: "What-If" Scenario')
+    fig.update_layout(
+        xaxis_title='Total Units Sold (Popularity)', yaxis_title='Total Revenue ($)',
+        height=700,
+        legend=dict(y=1.1),
+        # Bound the hover hit-test radius; spikedistance=-1 keeps spikes from widening it
+        hovermode='closest', hoverdistance=10, spikedistance=-1
+    )
+    return fig
+
+def make_plot3_what_if_quadrant(names, counts, amounts, prices, name_to_iloc, item_to_change, count_change_pct, price_change_pct):
+    """ 
+    PLOT 3: *** "WHAT-IF" VERSION ***
+    This function takes the what-if inputs and returns the modified plot.
+    Only the modeled item is redrawn; the rest comes from the cached base layer.
+    """
+    
+    # Read the modeled item straight off the column arrays: no row Series, no copy
+    try:
+        idx = name_to_iloc[item_to_change]
+    except KeyError:
+        st.error(f"Could not find item '{item_to_change}' to model.")
+        return go.Figure()
+
+    # Apply "what-if" logic
+    new_count = counts[idx] * (1 + count_change_pct / 100)
+    new_price = prices[idx] * (1 + price_change_pct / 100)
+    new_amount = new_count * new_price
+
+    # The cached figure is shared across reruns, so draw on a copy of it
+    fig = go.Figure(_quadrant_base(names, counts, amounts, prices, item_to_change))
     
     # Add the "What-If" item (larger, brighter)
-    what_if_item = df_what_if[df_what_if['Item Name'] == item_to_change]
-    fig.add_trace(go.Scatter(
-        x=what_if_item['Total_Count'], 
-        y=what_if_item['Total_Amount'],
+    fig.add_trace(go.Scattergl(
+        x=[new_count], 
+        y=[new_amount],
         mode='markers',
         name=f'WHAT-IF: {item_to_change}',
         marker=dict(
-            size=what_if_item['Total_Amount'] / 2000, sizemin=4, sizemode='diameter',
-            color=what_if_item['Avg_Price'], colorscale='Viridis',
+            size=[new_amount / 2000], sizemin=4, sizemode='diameter',
+            color=[new_price], colorscale='Viridis',
             line=dict(color=BRAND_COLOR, width=3), 
             opacity=1.0
         ),
-        text=what_if_item['Item Name'],
+        text=[item_to_change],
         hovertemplate=(
             "<b>%{text} (WHAT-IF)</b><br>" +
             "Total Sold: %{x:,.0f}<br>" +
@@ -216,47 +355,24 @@ def make_plot3_what_if_quadrant(item_summary_df, item_to_change, count_change_pc
             "<extra></extra>"
         )
     ))
-
-    # Add quadrant lines
-    fig.add_shape(type="line", x0=median_count, y0=0, x1=median_count, y1=df_what_if['Total_Amount'].max(), line=dict(color="Gray", width=2, dash="dash"))
-    fig.add_shape(type="line", x0=0, y0=median_amount, x1=df_what_if['Total_Count'].max(), y1=median_amount, line=dict(color="Gray", width=2, dash="dash"))
-    
-    # Add quadrant labels
-    fig.add_annotation(x=df_what_if['Total_Count'].max(), y=df_what_if['Total_Amount'].max(), text="<b>STARS</b><br>(High Sales, High Profit)", showarrow=False, xanchor='right', yanchor='top', font=dict(color='white', size=14))
-    fig.add_annotation(x=0, y=df_what_if['Total_Amount'].max(), text="<b>NICHE/PREMIUM</b><br>(Low Sales, High Profit)", showarrow=False, xanchor='left', yanchor='top', font=dict(color='white', size=14))
-    fig.add_annotation(x=df_what_if['Total_Count'].max(), y=0, text="<b>WORKHORSES</b><br>(High Sales, Low Profit)", showarrow=False, xanchor='right', yanchor='bottom', font=dict(color='white', size=14))
-    fig.add_annotation(x=0, y=0, text="<b>DOGS</b><br>(Low Sales, Low Profit)", showarrow=False, xanchor='left', yanchor='bottom', font=dict(color='white', size=14))
-
-    fig = apply_global_styles(fig, 'Item Analysis: "What-If" Scenario')
-    fig.update_layout(
-        xaxis_title='Total Units Sold (Popularity)', yaxis_title='Total Revenue ($)',
-        height=700,
-        legend=dict(y=1.1) 
-    )
     return fig
 
-def make_plot4_top_10_trends(df, top_10_item_names):
+def make_plot4_top_10_trends(pivot, top_10_item_names):
     """ PLOT 4: Monthly Sales Trends for Top 10 Items (Line Chart) """
-    month_order = ['May', 'June', 'July', 'August', 'September', 'October']
-    df_top_10 = df[df['Item Name'].isin(top_10_item_names)]
-    monthly_sales_top_10 = df_top_10.groupby(['Month', 'Item Name'])['Amount'].sum().reset_index()
-    monthly_sales_top_10['Month'] = pd.Categorical(monthly_sales_top_10['Month'], categories=month_order, ordered=True)
-    monthly_sales_top_10 = monthly_sales_top_10.sort_values('Month')
-
-    fig = px.line(
-        monthly_sales_top_10,
-        x='Month', y='Amount', color='Item Name',
-        labels={'Amount': 'Monthly Sales ($)', 'Item Name': 'Menu Item'},
-        markers=True
-    )
-    
-    if top_10_item_names:
-        top_item = top_10_item_names[0] 
-        for trace in fig.data:
-            if trace.name == top_item:
-                trace.update(line=dict(width=4))
-            else:
-                trace.update(opacity=0.5)
+    # unstack() yields a (Month, Item Name) index, already in ordered-Month order
+    monthly_sales_top_10 = pivot.loc[top_10_item_names].unstack().dropna().reset_index(name='Amount')
+
+    # One line per item, straight from the pivot rows; the top item is drawn bold, the rest faded
+    months = pivot.columns.tolist()
+    fig = go.Figure()
+    for i, name in enumerate(top_10_item_names):
+        fig.add_trace(go.Scatter(
+            x=months, y=pivot.loc[name].to_numpy(),
+            mode='lines+markers', name=name, connectgaps=True,
+            line=dict(width=4 if i == 0 else 2),
+            opacity=1.0 if i == 0 else 0.5,
+            hovertemplate='Menu Item=%{fullData.name}<br>Month=%{x}<br>Monthly Sales ($)=%{y}<extra></extra>'
+        ))
 
     fig = apply_global_styles(fig, 'Monthly Consumption Trends (by Item Revenue)')
     
@@ -269,16 +385,22 @@ def make_plot4_top_10_trends(df, top_10_item_names):
             xanchor="center",   # Center it
             x=0.5
         ),
+        legend_title_text='Menu Item',
         xaxis_title='Month', 
         yaxis_title='Monthly Revenue ($)'
     )
     return fig, monthly_sales_top_10
 
+@st.cache_resource
 def make_plot5_category_treemap(df):
     """ PLOT 5: Revenue by Menu Category (Treemap) """
+    # Hand plotly one row per item instead of every raw row
+    agg = df.groupby(['Category', 'Item Name'], observed=True, as_index=False)['Amount'].sum()
+    # plotly.express takes max() of the color column, which unordered Categoricals reject
+    agg = agg.astype({'Category': str, 'Item Name': str})
     fig = px.treemap(
-        df,
-        path=[px.Constant("All Items"), 'Category', 'Item Name'],
+        agg,
+        path=['Category', 'Item Name'],
         values='Amount',
         color='Category', 
         color_discrete_sequence=px.colors.qualitative.Pastel,
@@ -293,89 +415,87 @@ def make_plot5_category_treemap(df):
     fig.update_layout(margin = dict(t=50, l=25, r=25, b=25))
     return fig
 
-def make_plot6_movers_and_shakers(df):
+def make_plot6_movers_and_shakers(pivot):
     """ PLOT 6: "Movers & Shakers" (Percent Growth Bar Charts) """
-    first_half = df[df['Month'].isin(['May', 'June', 'July'])]
-    second_half = df[df['Month'].isin(['August', 'September', 'October'])]
-    first_half_sales = first_half.groupby('Item Name')['Amount'].sum()
-    second_half_sales = second_half.groupby('Item Name')['Amount'].sum()
+    # Month is an ordered Categorical: codes before August are May-Jul, the rest Aug-Oct
+    is_second_half = pivot.columns.codes >= MONTH_ORDER.index('August')
+    # Growth math runs in float64: in float32, First_Half + 1e-6 == First_Half for
+    # totals above ~10, which flattens every fully-faded item to exactly -100%
+    first_half_sales = pivot.loc[:, ~is_second_half].sum(axis=1).astype('float64')
+    second_half_sales = pivot.loc[:, is_second_half].sum(axis=1).astype('float64')
     growth_df = pd.DataFrame({'First_Half': first_half_sales, 'Second_Half': second_half_sales}).fillna(0)
     
     # Calculate % Growth, handle division by zero
     growth_df['Growth_Pct'] = 100 * (growth_df['Second_Half'] - growth_df['First_Half']) / (growth_df['First_Half'] + 1e-6)
     
     growth_df['Total_Sales'] = growth_df['First_Half'] + growth_df['Second_Half']
-    growth_df = growth_df.replace([np.inf, -np.inf], np.nan)
     growth_df = growth_df[growth_df['Total_Sales'] > 500] 
     growth_df = growth_df.dropna()
-    rising_stars = growth_df.nlargest(10, 'Growth_Pct').reset_index()
-    fading_items = growth_df.nsmallest(10, 'Growth_Pct').reset_index()
-
-    fig_rising = px.bar(
-        rising_stars,
-        x='Item Name', y='Growth_Pct',
-        labels={'Growth_Pct': 'Growth (%)', 'Item Name': 'Menu Item'},
-        text_auto='.1f'
-    )
-    fig_rising.update_traces(marker_color=POSITIVE_COLOR) 
+    growth = growth_df['Growth_Pct'].to_numpy()
+    rising_stars = growth_df.iloc[top_n_positions(growth, 10)].reset_index()
+    fading_items = growth_df.iloc[top_n_positions(-growth, 10)].reset_index()
+
+    fig_rising = go.Figure(go.Bar(
+        x=rising_stars['Item Name'], y=rising_stars['Growth_Pct'],
+        marker_color=POSITIVE_COLOR, texttemplate='%{y:.1f}',
+        hovertemplate='Menu Item=%{x}<br>Growth (%)=%{y}<extra></extra>'
+    ))
     fig_rising = apply_global_styles(fig_rising, '"Rising Stars" (Reorder Alert: High Growth)')
-    fig_rising.update_layout(xaxis={'categoryorder':'total descending'}, yaxis_title='Growth (%)')
+    fig_rising.update_layout(xaxis={'categoryorder':'total descending'}, xaxis_title='Menu Item', yaxis_title='Growth (%)')
 
-    fig_fading = px.bar(
-        fading_items,
-        x='Item Name', y='Growth_Pct',
-        labels={'Growth_Pct': 'Growth (%)', 'Item Name': 'Menu Item'},
-        text_auto='.1f'
-    )
-    fig_fading.update_traces(marker_color=NEGATIVE_COLOR) 
+    fig_fading = go.Figure(go.Bar(
+        x=fading_items['Item Name'], y=fading_items['Growth_Pct'],
+        marker_color=NEGATIVE_COLOR, texttemplate='%{y:.1f}',
+        hovertemplate='Menu Item=%{x}<br>Growth (%)=%{y}<extra></extra>'
+    ))
     fig_fading = apply_global_styles(fig_fading, '"Fading Items" (Overstock Alert: High Decline)')
-    fig_fading.update_layout(xaxis={'categoryorder':'total ascending'}, yaxis_title='Growth (%)')
+    fig_fading.update_layout(xaxis={'categoryorder':'total ascending'}, xaxis_title='Menu Item', yaxis_title='Growth (%)')
     
     return fig_rising, fig_fading, rising_stars, fading_items
 
-def make_plot7_pareto_analysis(df):
+@st.cache_resource
+def make_plot7_pareto_analysis(pivot):
     """ PLOT 7: Pareto Analysis (80/20 Rule) - DE-CLUTTERED """
-    item_sales = df.groupby('Item Name')['Amount'].sum().reset_index()
-    item_sales = item_sales.sort_values(by='Amount', ascending=False)
+    item_sales = pivot.sum(axis=1).sort_values(ascending=False)
+    vals = item_sales.to_numpy()
+    names = item_sales.index.to_numpy()
     
     N_TOP_ITEMS = 20 
     
-    if len(item_sales) > N_TOP_ITEMS:
-        df_top_n = item_sales.head(N_TOP_ITEMS)
-        df_other = item_sales.tail(-N_TOP_ITEMS)
-        other_row = pd.DataFrame({'Item Name': ['All Other Items'], 'Amount': [df_other['Amount'].sum()]})
-        pareto_df = pd.concat([df_top_n, other_row]).reset_index(drop=True)
+    if len(vals) > N_TOP_ITEMS:
+        # Fold the long tail into a single bar, straight on the arrays
+        names_final = np.concatenate([names[:N_TOP_ITEMS], ['All Other Items']])
+        amts_final = np.concatenate([vals[:N_TOP_ITEMS], [vals[N_TOP_ITEMS:].sum()]])
     else:
-        pareto_df = item_sales
+        names_final = names
+        amts_final = vals
     
-    total_revenue = pareto_df['Amount'].sum()
-    pareto_df['Cumulative_Amount'] = pareto_df['Amount'].cumsum()
-    pareto_df['Cumulative_Pct'] = 100 * pareto_df['Cumulative_Amount'] / total_revenue
+    cum = np.cumsum(amts_final)
+    total_revenue = cum[-1] if len(cum) else 0.0
+    cumulative_pct = 100 * cum / total_revenue if total_revenue > 0 else np.zeros_like(cum)
     
-    total_items = len(item_sales) 
+    total_items = len(vals) 
     
     pareto_summary = "Pareto analysis incomplete (insufficient item diversity)."
-    if not pareto_df[pareto_df['Cumulative_Pct'] >= 80].empty:
-        try:
-            num_items_for_80 = pareto_df[pareto_df['Cumulative_Pct'] >= 80].index[0] + 1
-            pct_items = 100 * num_items_for_80 / total_items
-            pareto_summary = f"Your Top {num_items_for_80} items (just {pct_items:.1f}% of your menu) drive 80% of your revenue."
-        except IndexError:
-             pareto_summary = "Pareto analysis incomplete."
+    if total_revenue > 0:
+        # First position where the running total reaches 80% of revenue
+        num_items_for_80 = int(np.searchsorted(cum, 0.8 * total_revenue)) + 1
+        pct_items = 100 * num_items_for_80 / total_items
+        pareto_summary = f"Your Top {num_items_for_80} items (just {pct_items:.1f}% of your menu) drive 80% of your revenue."
 
     print(f"\nPARETO ANALYSIS: {pareto_summary}\n")
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     fig.add_trace(
         go.Bar(
-            x=pareto_df['Item Name'], y=pareto_df['Amount'],
+            x=names_final, y=amts_final,
             name='Revenue per Item', marker_color=BRAND_COLOR
         ),
         secondary_y=False,
     )
     fig.add_trace(
         go.Scatter(
-            x=pareto_df['Item Name'], y=pareto_df['Cumulative_Pct'],
+            x=names_final, y=cumulative_pct,
             name='Cumulative Revenue %', mode='lines+markers', marker_color=NEGATIVE_COLOR
         ),
         secondary_y=True,
@@ -419,13 +539,14 @@ def main():
         return
     
     # --- Pre-calculate all dataframes ---
-    item_summary_df = get_item_summary(df)
-    fig1 = make_plot1_sales_per_month(df)
-    fig2, top_10_items = make_plot2_top_10_items(df)
-    fig4, monthly_sales_top_10 = make_plot4_top_10_trends(df, top_10_items['Item Name'].tolist())
+    names, counts, amounts, prices, name_to_iloc = get_item_arrays(df)
+    item_month_pivot = get_item_month_pivot(df)
+    fig1 = make_plot1_sales_per_month(item_month_pivot)
+    fig2, top_10_items = make_plot2_top_10_items(item_month_pivot)
+    fig4, monthly_sales_top_10 = make_plot4_top_10_trends(item_month_pivot, top_10_items['Item Name'].tolist())
     fig5 = make_plot5_category_treemap(df)
-    fig6_rising, fig6_fading, rising_stars, fading_items = make_plot6_movers_and_shakers(df)
-    fig7, pareto_summary = make_plot7_pareto_analysis(df)
+    fig6_rising, fig6_fading, rising_stars, fading_items = make_plot6_movers_and_shakers(item_month_pivot)
+    fig7, pareto_summary = make_plot7_pareto_analysis(item_month_pivot)
     
     
     # --- NEW LAYOUT ---
@@ -493,14 +614,12 @@ def main():
     st.subheader('📈 "What-If" Menu Item Planner')
     st.markdown("Use these sliders to see how changing a product's price or sales impacts its position in the menu. This helps you plan promotions and stocking priorities.")
 
-    item_list = item_summary_df['Item Name'].unique()
+    item_list = names
     
     col1, col2, col3 = st.columns(3)
     with col1:
         # Default to 'Beef Ramen' if it exists, otherwise default to the first item
-        default_index = 0
-        if "Beef Ramen" in item_list:
-            default_index = list(item_list).index("Beef Ramen")
+        default_index = name_to_iloc.get("Beef Ramen", 0)
             
         item_to_change = st.selectbox(
             "Select an Item to Model:",
@@ -518,7 +637,7 @@ def main():
             min_value=-50, max_value=100, value=0, step=5, format="%d%%"
         )
 
-    fig3_what_if = make_plot3_what_if_quadrant(item_summary_df, item_to_change, count_change_pct, price_change_pct)
+    fig3_what_if = make_plot3_what_if_quadrant(names, counts, amounts, prices, name_to_iloc, item_to_change, count_change_pct, price_change_pct)
     st.plotly_chart(fig3_what_if, use_container_width=True)
     
 